@@ -0,0 +1,520 @@
+"""
+Performance benchmarks for TransitBackend.
+
+Run all:      python benchmark.py
+Run some:     python benchmark.py walking
+
+All external services are replaced by local stand-ins, no internet needed.
+"""
+import datetime
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import networkx as nx
+import numpy as np
+
+from transit_backend import TransitBackend
+from walking_router import haversine_km
+
+
+# ============================================================
+#  Helpers
+# ============================================================
+def timed(fn, repeat):
+    """Run fn() `repeat` times, return mean milliseconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000.0 / repeat
+
+
+class _DirectionsStub(BaseHTTPRequestHandler):
+    """Local stand-in for the Google Directions API (walking mode)."""
+
+    def do_GET(self):
+        q = parse_qs(urlparse(self.path).query)
+        lat1, lon1 = map(float, q["origin"][0].split(","))
+        lat2, lon2 = map(float, q["destination"][0].split(","))
+        meters = int(haversine_km(lat1, lon1, lat2, lon2) * 1300)
+        body = json.dumps({"routes": [{"legs": [{"distance": {"value": meters}}]}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_directions_stub():
+    """Start the stub server in a background thread, return its URL."""
+    server = HTTPServer(("127.0.0.1", 0), _DirectionsStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/maps/api/directions/json"
+
+
+def write_street_grid(path, n, spacing_deg=0.001, lat0=24.85, lon0=66.98):
+    """Write an n x n street grid as GeoJSON (one LineString per street)."""
+    features = []
+    for i in range(n):
+        lat = lat0 + i * spacing_deg
+        features.append({
+            "type": "Feature",
+            "properties": {"name": f"Street {i}", "highway": "residential"},
+            "geometry": {"type": "LineString",
+                         "coordinates": [[lon0 + j * spacing_deg, lat] for j in range(n)]},
+        })
+        lon = lon0 + i * spacing_deg
+        features.append({
+            "type": "Feature",
+            "properties": {"name": f"Avenue {i}", "highway": "residential"},
+            "geometry": {"type": "LineString",
+                         "coordinates": [[lon, lat0 + j * spacing_deg] for j in range(n)]},
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f)
+
+
+def build_synthetic_network(side, spacing_deg=0.005, seed=0, lat0=24.80, lon0=66.95):
+    """
+    City-scale synthetic network: side x side stops on a jittered grid
+    (~500 m apart), a road between grid neighbours, one line per row and
+    one per column. Road lengths are >= the straight-line distance.
+
+    Returns (stops, lines, road_segments) for TransitBackend.load_network.
+    """
+    rng = random.Random(seed)
+    stops = {}
+    for r in range(side):
+        for c in range(side):
+            stops[f"S{r}_{c}"] = {
+                "name": f"Stop {r}-{c}",
+                "lat": lat0 + (r + rng.uniform(-0.2, 0.2)) * spacing_deg,
+                "lon": lon0 + (c + rng.uniform(-0.2, 0.2)) * spacing_deg,
+            }
+
+    segments = []
+    for r in range(side):
+        for c in range(side):
+            a = f"S{r}_{c}"
+            for b in ([f"S{r}_{c + 1}"] if c + 1 < side else []) + ([f"S{r + 1}_{c}"] if r + 1 < side else []):
+                straight = haversine_km(stops[a]["lat"], stops[a]["lon"], stops[b]["lat"], stops[b]["lon"])
+                segments.append((a, b, straight * rng.uniform(1.0, 1.3)))
+
+    lines = {}
+    for i in range(side):
+        lines[f"R{i}"] = {"stops": [f"S{i}_{c}" for c in range(side)], "color": "red"}
+        lines[f"C{i}"] = {"stops": [f"S{r}_{i}" for r in range(side)], "color": "blue"}
+
+    return stops, lines, segments
+
+
+def synthetic_backend(side, seed=0):
+    backend = TransitBackend()
+    backend.load_network(*build_synthetic_network(side, seed=seed))
+    return backend
+
+
+# ============================================================
+#  FR2.4.4 — Offline walking router vs HTTP Directions call
+# ============================================================
+def bench_walking():
+    print("\n=== Walking distance: offline A* vs HTTP (local stub) ===")
+    n = 150  # 150 x 150 grid = 22 500 intersections, ~16 km per side
+    rng = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "streets.geojson")
+        write_street_grid(path, n)
+
+        start = time.perf_counter()
+        backend = TransitBackend(walking_graph_path=path)
+        load_ms = (time.perf_counter() - start) * 1000.0
+
+    server, url = start_directions_stub()
+    backend.DIRECTIONS_URL = url
+
+    # Walks of up to ~2 km, the range used for stop access/egress
+    pairs = []
+    for _ in range(200):
+        lat = 24.87 + rng.random() * 0.11
+        lon = 67.00 + rng.random() * 0.11
+        pairs.append((lat, lon, lat + rng.uniform(-0.012, 0.012), lon + rng.uniform(-0.012, 0.012)))
+    it = iter(pairs)
+
+    offline_ms = timed(lambda: backend.calculate_walking_distance(*next(it)), len(pairs))
+    it = iter(pairs)
+    http_ms = timed(lambda: backend._road_distance(*next(it)), len(pairs))
+    server.shutdown()
+
+    print(f"Graph: {len(backend.walking_router.nodes)} nodes, "
+          f"{len(backend.walking_router.edges)} edges, loaded in {load_ms:.0f} ms")
+    print(f"Offline A*        : {offline_ms:8.3f} ms / query")
+    print(f"HTTP (local stub) : {http_ms:8.3f} ms / query  (real API adds WAN latency)")
+
+
+# ============================================================
+#  Network updates — incremental vs full rebuild
+# ============================================================
+def bench_updates():
+    print("\n=== Network updates: incremental vs full rebuild ===")
+    print(f"{'stops':>8} {'rebuild ms':>11} {'add+remove stop':>16} {'update_line':>12} {'close+reopen':>13}")
+    for side in (30, 100, 200):
+        stops, lines, segments = build_synthetic_network(side)
+        backend = TransitBackend()
+
+        start = time.perf_counter()
+        backend.load_network(stops, lines, segments)
+        rebuild_ms = (time.perf_counter() - start) * 1000.0
+
+        mid = side // 2
+        counter = iter(range(10 ** 6))
+
+        def add_remove():
+            sid = f"NEW{next(counter)}"
+            backend.add_stop(sid, "New stop", 24.9, 67.1, [(f"S{mid}_{mid}", 0.3)])
+            backend.update_line(f"R{mid}", stops=lines[f"R{mid}"]["stops"][:mid] + [sid])
+            backend.remove_stop(sid)
+
+        # Reroute a line: swap a 10-stop stretch between two variants
+        base = list(backend.lines[f"R{mid}"]["stops"])
+        variants = [base, base[:mid] + [f"S{mid + 1}_{c}" for c in range(mid, mid + 10)]]
+        flip = iter(range(10 ** 6))
+
+        def reroute():
+            backend.update_line(f"R{mid}", stops=variants[next(flip) % 2])
+
+        def close_reopen():
+            backend.close_segment(f"S{mid}_{mid}", f"S{mid}_{mid + 1}")
+            backend.reopen_segment(f"S{mid}_{mid}", f"S{mid}_{mid + 1}")
+
+        print(f"{len(stops):>8} {rebuild_ms:>11.1f} {timed(add_remove, 200):>13.3f} ms"
+              f" {timed(reroute, 200):>9.3f} ms {timed(close_reopen, 200):>10.3f} ms")
+    print("(update_line cost grows with the line's own length, not the network)")
+
+
+# ============================================================
+#  FR2.3.1 — Fare matrix and bulk quotes
+# ============================================================
+def bench_fares():
+    print("\n=== Fares: 1M OD quotes from the fare matrix ===")
+    backend = synthetic_backend(32)  # 1024 stops
+    stops = list(backend.stops)
+    rng = random.Random(2)
+
+    start = time.perf_counter()
+    backend.get_fare_matrix()
+    build_ms = (time.perf_counter() - start) * 1000.0
+
+    n = 1_000_000
+    origins = [rng.choice(stops) for _ in range(n)]
+    destinations = [rng.choice(stops) for _ in range(n)]
+    start = time.perf_counter()
+    fares = backend.quote_fares(origins, destinations)
+    quote_ms = (time.perf_counter() - start) * 1000.0
+
+    # Per-path pricing for comparison (route search + calculate_fares)
+    sample = 200
+    start = time.perf_counter()
+    paths = [backend.get_shortest_distance_route(o, d)["path"]
+             for o, d in zip(origins[:sample], destinations[:sample])]
+    slow = backend.calculate_fares(paths)
+    per_path_ms = (time.perf_counter() - start) * 1000.0 / sample
+    assert np.array_equal(slow, fares[:sample])
+
+    start = time.perf_counter()
+    backend.set_fare_structure(per_km=3.0)
+    backend.get_fare_matrix()
+    price_ms = (time.perf_counter() - start) * 1000.0
+
+    start = time.perf_counter()
+    backend.update_line("R5", stops=backend.lines["R5"]["stops"][:16])
+    backend.get_fare_matrix()
+    line_ms = (time.perf_counter() - start) * 1000.0
+
+    print(f"Matrix build ({len(stops)} stops)      : {build_ms:9.1f} ms")
+    print(f"1M quotes from matrix          : {quote_ms:9.1f} ms")
+    print(f"Route + price, per pair        : {per_path_ms:9.3f} ms  (~{per_path_ms * n / 1000:.0f} s for 1M)")
+    print(f"Refresh after price change     : {price_ms:9.1f} ms")
+    print(f"Refresh after line change      : {line_ms:9.1f} ms")
+
+    # Incremental refreshes must match a full rebuild, on a network small
+    # enough to rebuild after every edit
+    backend = synthetic_backend(12)
+    stops = list(backend.stops)
+    backend.set_fare_structure(zones={s: 1 + i % 3 for i, s in enumerate(stops)}, zone_caps={3: 30.0})
+    backend.get_fare_matrix()
+    edits = 40
+    for i in range(edits):
+        backend.update_line(rng.choice(list(backend.lines) + [f"X{i}"]),
+                            stops=rng.sample(stops, rng.randint(2, 8)))
+        if i % 7 == 0:
+            backend.set_fare_structure(zones={s: rng.randint(1, 3) for s in stops})
+        ids, incremental = backend.get_fare_matrix()
+        incremental = incremental.copy()
+        backend._fare_tables = None
+        rebuilt_ids, rebuilt = backend.get_fare_matrix()
+        assert ids == rebuilt_ids and np.array_equal(incremental, rebuilt)
+        o, d = rng.choice(stops), rng.choice(stops)
+        path = backend.get_shortest_distance_route(o, d)["path"]
+        assert backend.quote_fares([o], [d])[0] == backend.calculate_fare(path)
+    print(f"Incremental refresh == full rebuild after {edits} random line/zone edits")
+
+
+# ============================================================
+#  FR2.3.2 — Delay profiles: ingest cost and query cost vs history
+# ============================================================
+def bench_delays():
+    print("\n=== Delay profiles: incremental ingest, O(1) reads ===")
+    backend = synthetic_backend(100)  # 10 000 stops
+    rng = random.Random(3)
+    lines = list(backend.lines)
+    day = datetime.datetime(2026, 1, 5)
+
+    route = backend.get_shortest_distance_route("S10_10", "S60_70")["path"]
+
+    print(f"{'reports':>9} {'ingest us/report':>17} {'fastest route ms':>17} {'estimate ms':>12}")
+    total = 0
+    for batch in (1_000, 10_000, 100_000):
+        reports = []
+        for _ in range(batch - total):
+            line = rng.choice(lines)
+            stop = rng.choice(backend.lines[line]["stops"])
+            reports.append((line, stop, rng.uniform(0, 15), day.replace(hour=rng.randrange(24))))
+        start = time.perf_counter()
+        for line, stop, delay, ts in reports:
+            backend.report_delay(line, stop, "", delay_min=delay, timestamp=ts)
+        ingest_us = (time.perf_counter() - start) * 1e6 / len(reports)
+        total = batch
+
+        rush = day.replace(hour=8)
+        fastest_ms = timed(lambda: backend.get_fastest_route("S10_10", "S60_70", rush), 3)
+        estimate_ms = timed(lambda: backend.estimate_total_travel_time(route, 0, [], rush), 50)
+        print(f"{total:>9} {ingest_us:>17.2f} {fastest_ms:>17.1f} {estimate_ms:>12.3f}")
+
+
+# ============================================================
+#  FR2.1.3.a — K alternatives: plateau method vs Yen's
+# ============================================================
+def bench_alternatives():
+    print("\n=== Alternative routes: latency vs K (10 000 stops) ===")
+    backend = synthetic_backend(100)
+    pairs = [("S10_10", "S60_70"), ("S5_90", "S80_20"), ("S50_0", "S50_99")]
+    # Trips of up to ~5 km, where the stretch bound keeps both trees small
+    local = [("S40_40", "S50_45"), ("S20_70", "S12_62"), ("S75_30", "S70_40")]
+
+    print(f"{'K':>3} {'plateau ms':>11} {'found':>6} {'Yen ms':>9} {'local ms':>9}")
+    for k in (1, 2, 3, 5):
+        found = []
+
+        def plateau():
+            for o, d in pairs:
+                found.append(len(backend.get_alternative_routes(o, d, k=k)))
+
+        plateau_ms = timed(plateau, 1) / len(pairs)
+        local_ms = timed(lambda: [backend.get_alternative_routes(o, d, k=k) for o, d in local], 5) / len(local)
+
+        def yen():
+            for o, d in pairs:
+                paths = nx.shortest_simple_paths(backend.graph, o, d, weight="weight")
+                for _ in range(k):
+                    next(paths)
+
+        yen_ms = timed(yen, 1) / len(pairs)
+        print(f"{k:>3} {plateau_ms:>11.1f} {min(found):>6} {yen_ms:>9.1f} {local_ms:>9.1f}")
+    print("(Yen's paths are unfiltered and mostly near-duplicates of each other)")
+
+
+# ============================================================
+#  Trip planning — one multi-source search vs k x k stop pairs
+# ============================================================
+def bench_plan_trip():
+    print("\n=== plan_trip: multi-source search vs k x k loop (10 000 stops) ===")
+    backend = synthetic_backend(100)
+    rng = random.Random(4)
+    depart = datetime.datetime(2026, 1, 5, 9, 0)
+    taps = [(24.80 + rng.random() * 0.49, 66.95 + rng.random() * 0.49,
+             24.80 + rng.random() * 0.49, 66.95 + rng.random() * 0.49) for _ in range(10)]
+
+    def walk_min(km):
+        return km / backend.WALKING_SPEED_KMH * 60.0
+
+    def pairwise(lat1, lon1, lat2, lon2, k):
+        best = float("inf")
+        for wo, o in backend._nearest_stops(lat1, lon1, k, 2.0):
+            for wd, d in backend._nearest_stops(lat2, lon2, k, 2.0):
+                ride = backend.get_fastest_route(o, d, depart)["total_time"]
+                best = min(best, walk_min(wo) + ride + walk_min(wd))
+        return best
+
+    print(f"{'k':>3} {'plan_trip ms':>13} {'k x k loop ms':>14}")
+    for k in (1, 3, 5):
+        results = []
+        fast_ms = timed(lambda: results.append(backend.plan_trip(*taps[len(results)], k=k,
+                                                                 departure_time=depart)), len(taps))
+        slow = []
+        slow_ms = timed(lambda: slow.append(pairwise(*taps[len(slow)], k)), len(taps))
+        assert all(abs(r["total_time"] - s) < 1e-6 for r, s in zip(results, slow))
+        print(f"{k:>3} {fast_ms:>13.1f} {slow_ms:>14.1f}")
+
+
+# ============================================================
+#  FR2.4.3 — Nearest stops: grid ring search vs full scan
+# ============================================================
+def bench_nearest():
+    print("\n=== Nearest stops: grid ring search vs full scan (10 000 stops) ===")
+    backend = synthetic_backend(100)
+    rng = random.Random(6)
+    coords = [(s, backend.stops[s]["lat"], backend.stops[s]["lon"]) for s in backend.stops]
+
+    def brute(lat, lon, k, max_km):
+        found = sorted((backend._haversine_distance(lat, lon, s_lat, s_lon), s) for s, s_lat, s_lon in coords)
+        return [x for x in found if max_km is None or x[0] <= max_km][:k]
+
+    # In-town taps, taps just outside the network, and taps far away
+    # (those fall back to scanning the occupied cells)
+    taps = {
+        "in town": [(24.80 + rng.random() * 0.49, 66.95 + rng.random() * 0.49) for _ in range(100)],
+        "outskirts": [(24.70 + rng.random() * 0.7, 66.85 + rng.random() * 0.7) for _ in range(100)],
+        "far away": [(rng.uniform(-60, 60), rng.uniform(-180, 180)) for _ in range(20)],
+    }
+    print(f"{'taps':<10} {'ring search ms':>15} {'full scan ms':>13}")
+    for label, points in taps.items():
+        queries = [(lat, lon, rng.choice([1, 3, 5, 20]), rng.choice([None, 0.3, 2.0])) for lat, lon in points]
+        fast, slow = [], []
+        fast_ms = timed(lambda: fast.append(backend._nearest_stops(*queries[len(fast)])), len(queries))
+        slow_ms = timed(lambda: slow.append(brute(*queries[len(slow)])), len(queries))
+        assert fast == slow
+        print(f"{label:<10} {fast_ms:>15.3f} {slow_ms:>13.1f}")
+
+
+# ============================================================
+#  FR2.1.3.a — Bidirectional A* vs Dijkstra
+# ============================================================
+def bench_astar():
+    print("\n=== Point-to-point: Dijkstra vs bidirectional A* ===")
+    rng = random.Random(5)
+    print(f"{'stops':>7} {'method':<18} {'ms/query':>9} {'settled':>9}")
+    for side in (100, 200):
+        backend = synthetic_backend(side)
+        stops = list(backend.stops)
+        pairs = [(rng.choice(stops), rng.choice(stops)) for _ in range(20)]
+
+        start = time.perf_counter()
+        backend.precompute_landmarks(8)
+        lm_ms = (time.perf_counter() - start) * 1000.0
+        landmarks = backend._landmark_dist
+
+        # Dijkstra settles every stop closer than the destination
+        lengths = []
+        ms = timed(lambda: lengths.append(
+            backend.get_shortest_distance_route(*pairs[len(lengths)])["total_distance"]), len(pairs))
+        settled = sum(
+            len(nx.single_source_dijkstra_path_length(backend.graph, o, cutoff=d, weight="weight"))
+            for (o, _), d in zip(pairs, lengths)) / len(pairs)
+        print(f"{len(stops):>7} {'dijkstra':<18} {ms:>9.1f} {settled:>9.0f}")
+
+        for label, lm in (("bidir A* (geo)", None), ("bidir A* (ALT 8)", landmarks)):
+            backend._landmark_dist = lm
+            results = []
+            ms = timed(lambda: results.append(backend._bidirectional_astar(*pairs[len(results)])), len(pairs))
+            assert all(r[0] == d for r, d in zip(results, lengths))
+            settled = sum(r[2] for r in results) / len(pairs)
+            print(f"{len(stops):>7} {label:<18} {ms:>9.1f} {settled:>9.0f}")
+        print(f"{'':>7} (landmark precompute: {lm_ms:.0f} ms)")
+
+    # Random queries under a line closure and avoided stops, with and
+    # without landmarks: A* lengths must equal Dijkstra's exactly
+    backend = synthetic_backend(30)
+    stops = list(backend.stops)
+    backend.add_service_alert("R3", "closed", closes_line=True)
+    checked = 0
+    for num_landmarks in (0, 8):
+        if num_landmarks:
+            backend.precompute_landmarks(num_landmarks)
+        for i in range(500):
+            o, d = rng.choice(stops), rng.choice(stops)
+            avoid = {"stops": [rng.choice([s for s in stops if s not in (o, d)])]} if i % 3 == 0 else None
+            astar = backend.get_shortest_distance_route(o, d, avoid=avoid, method="astar")
+            dijkstra = backend.get_shortest_distance_route(o, d, avoid=avoid)
+            assert astar["total_distance"] == dijkstra["total_distance"]
+            checked += 1
+    print(f"A* == Dijkstra on {checked} random queries (line closed, stops avoided)")
+
+
+# ============================================================
+#  Memory per stop — dict-of-dicts vs columnar tables
+# ============================================================
+def bench_memory():
+    print("\n=== Memory per stop: dicts vs stop/line tables (40 000 stops) ===")
+    stops, lines, _ = build_synthetic_network(200)
+
+    def measure(build):
+        gc.collect()
+        tracemalloc.start()
+        kept = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del kept
+        return size / len(stops)
+
+    def dicts():
+        # previous layout: dict per stop, list per line, stop -> [lines],
+        # cached tap details per stop
+        s = {k: {"name": v["name"], "lat": v["lat"], "lon": v["lon"]} for k, v in stops.items()}
+        ln = {k: {"stops": list(v["stops"]), "color": v["color"]} for k, v in lines.items()}
+        stop_lines = {k: [] for k in s}
+        for name, line in ln.items():
+            for stop in line["stops"]:
+                stop_lines[stop].append(name)
+        details = {
+            k: {"id": k, "name": v["name"], "lat": v["lat"], "lon": v["lon"],
+                "routes": list(stop_lines[k]),
+                "services": [{"line": n, "color": ln[n]["color"]} for n in stop_lines[k]]}
+            for k, v in s.items()
+        }
+        return s, ln, stop_lines, details
+
+    def tables():
+        # current layout, with the same cached tap details
+        backend = TransitBackend.__new__(TransitBackend)
+        backend._load_tables(stops, lines)
+        backend._stop_details = []
+        for stop_id in stops:
+            backend._refresh_stop_details(stop_id)
+        return backend._stop_table, backend._line_table, backend._membership, backend._stop_details
+
+    before = measure(dicts)
+    after = measure(tables)
+    print(f"dict-of-dicts + details : {before:7.0f} bytes / stop")
+    print(f"tables + details        : {after:7.0f} bytes / stop")
+    print("(stop ID, name and coordinate objects already exist and are counted in neither)")
+
+
+BENCHMARKS = {
+    "walking": bench_walking,
+    "updates": bench_updates,
+    "fares": bench_fares,
+    "delays": bench_delays,
+    "alternatives": bench_alternatives,
+    "plan_trip": bench_plan_trip,
+    "nearest": bench_nearest,
+    "astar": bench_astar,
+    "memory": bench_memory,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
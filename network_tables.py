@@ -0,0 +1,212 @@
+from array import array
+from collections.abc import Mapping
+from types import MappingProxyType
+
+
+class StopTable:
+    """
+    Columnar stop storage. Every stop gets an interned integer ID (its row);
+    names and coordinates live in flat arrays instead of one dict per stop.
+    Rows of removed stops are reused by later additions.
+    """
+
+    def __init__(self):
+        self.ids = []          # row -> stop_id (None for a free row)
+        self.index = {}        # stop_id -> row
+        self.names = []
+        self.lat = array("d")
+        self.lon = array("d")
+        self._free = []
+
+    def add(self, stop_id, name, lat, lon):
+        if self._free:
+            row = self._free.pop()
+            self.ids[row] = stop_id
+            self.names[row] = name
+            self.lat[row] = lat
+            self.lon[row] = lon
+        else:
+            row = len(self.ids)
+            self.ids.append(stop_id)
+            self.names.append(name)
+            self.lat.append(lat)
+            self.lon.append(lon)
+        self.index[stop_id] = row
+        return row
+
+    def remove(self, stop_id):
+        row = self.index.pop(stop_id)
+        self.ids[row] = None
+        self.names[row] = None
+        self._free.append(row)
+        return row
+
+    def coords(self, stop_id):
+        row = self.index[stop_id]
+        return self.lat[row], self.lon[row]
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, stop_id):
+        return stop_id in self.index
+
+
+class LineTable:
+    """
+    Line storage with interned integer IDs. A line's stops are kept as an
+    array of stop rows.
+    """
+
+    def __init__(self):
+        self.names = []        # row -> line name
+        self.index = {}        # line name -> row
+        self.colors = []
+        self.stops = []        # row -> array("i") of stop rows
+
+    def set(self, name, stop_rows, color):
+        row = self.index.get(name)
+        if row is None:
+            row = len(self.names)
+            self.names.append(name)
+            self.colors.append(color)
+            self.stops.append(array("i", stop_rows))
+            self.index[name] = row
+        else:
+            self.colors[row] = color
+            self.stops[row] = array("i", stop_rows)
+        return row
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, name):
+        return name in self.index
+
+
+class Membership:
+    """
+    stop row -> line rows, in CSR form (offsets + one flat values array).
+
+    Edits go to a small overlay dict; once the overlay grows past
+    COMPACT_RATIO of the rows it is merged back into the CSR arrays, so
+    single edits stay O(lines at the stop) and lookups stay O(1).
+    """
+
+    COMPACT_RATIO = 0.05
+
+    def __init__(self):
+        self.offsets = array("i", [0])
+        self.values = array("i")
+        self._overlay = {}
+
+    def build(self, rows):
+        """rows: list indexed by stop row of line-row lists."""
+        offsets = array("i", [0])
+        values = array("i")
+        for line_rows in rows:
+            values.extend(line_rows)
+            offsets.append(len(values))
+        self.offsets = offsets
+        self.values = values
+        self._overlay = {}
+
+    def get(self, stop_row):
+        if stop_row in self._overlay:
+            return self._overlay[stop_row]
+        if stop_row + 1 >= len(self.offsets):
+            return ()
+        return self.values[self.offsets[stop_row]:self.offsets[stop_row + 1]]
+
+    def common_line(self, row_a, row_b):
+        """Lowest line row serving both stops, or None (same either way round)."""
+        lines_b = self.get(row_b)
+        return min((r for r in self.get(row_a) if r in lines_b), default=None)
+
+    def set(self, stop_row, line_rows):
+        self._overlay[stop_row] = tuple(line_rows)
+        if len(self._overlay) > max(64, self.COMPACT_RATIO * len(self.offsets)):
+            self.compact()
+
+    def compact(self):
+        n = max(len(self.offsets) - 1, max(self._overlay, default=-1) + 1)
+        self.build([list(self.get(row)) for row in range(n)])
+
+
+# ============================================================
+#  Read-only mapping facades over the tables
+# ============================================================
+
+class StopsView(Mapping):
+    """
+    backend.stops: {stop_id: {"name": ..., "lat": ..., "lon": ...}}
+    Entries are built on access; the data stays in the StopTable.
+    """
+
+    def __init__(self, table):
+        self._table = table
+
+    def __getitem__(self, stop_id):
+        row = self._table.index[stop_id]
+        t = self._table
+        return MappingProxyType({"name": t.names[row], "lat": t.lat[row], "lon": t.lon[row]})
+
+    def __contains__(self, stop_id):
+        return stop_id in self._table.index
+
+    def __iter__(self):
+        return iter(self._table.index)
+
+    def __len__(self):
+        return len(self._table.index)
+
+
+class LinesView(Mapping):
+    """
+    backend.lines: {line_name: {"stops": (...), "color": ...}}
+    """
+
+    def __init__(self, lines, stops):
+        self._lines = lines
+        self._stops = stops
+
+    def __getitem__(self, name):
+        row = self._lines.index[name]
+        ids = self._stops.ids
+        return MappingProxyType({
+            "stops": tuple(ids[s] for s in self._lines.stops[row]),
+            "color": self._lines.colors[row],
+        })
+
+    def __contains__(self, name):
+        return name in self._lines.index
+
+    def __iter__(self):
+        return iter(self._lines.index)
+
+    def __len__(self):
+        return len(self._lines.index)
+
+
+class StopLinesView(Mapping):
+    """
+    stop_id -> tuple of line names serving it (from the CSR membership).
+    """
+
+    def __init__(self, stops, lines, membership):
+        self._stops = stops
+        self._lines = lines
+        self._membership = membership
+
+    def __getitem__(self, stop_id):
+        names = self._lines.names
+        return tuple(names[r] for r in self._membership.get(self._stops.index[stop_id]))
+
+    def __contains__(self, stop_id):
+        return stop_id in self._stops.index
+
+    def __iter__(self):
+        return iter(self._stops.index)
+
+    def __len__(self):
+        return len(self._stops.index)
@@ -0,0 +1,180 @@
+"""
+Replay captured TransitBackend traffic and report latency / throughput.
+
+Capture (in the app):
+    backend.start_request_log("requests.log.jsonl")
+    ...
+    backend.stop_request_log()
+
+Make a synthetic log instead:
+    python replay.py record requests.log.jsonl --requests 500 --rate 50
+
+Replay it:
+    python replay.py replay requests.log.jsonl                    # original pacing
+    python replay.py replay requests.log.jsonl --speed 10         # 10x faster
+    python replay.py replay requests.log.jsonl --speed 0 -c 8     # flat out, 8 workers
+
+Use the same --side for record and replay (stop IDs must exist).
+Google Directions calls go to a local stub, never to the internet.
+"""
+import argparse
+import datetime
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmark import start_directions_stub, synthetic_backend
+from request_log import read_request_log
+from transit_backend import TransitBackend
+
+
+def build_backend(side):
+    """Dummy network (side=0) or a side x side synthetic one, wired to the stub."""
+    backend = synthetic_backend(side) if side else TransitBackend()
+    server, url = start_directions_stub()
+    backend.DIRECTIONS_URL = url
+    return backend, server
+
+
+# ============================================================
+#  record — generate a synthetic workload log
+# ============================================================
+def record(args):
+    backend, server = build_backend(args.side)
+    rng = random.Random(args.seed)
+    stops = list(backend.stops)
+    lats = [backend.stops[s]["lat"] for s in stops]
+    lons = [backend.stops[s]["lon"] for s in stops]
+
+    def tap():
+        return (rng.uniform(min(lats), max(lats)), rng.uniform(min(lons), max(lons)))
+
+    def pair():
+        return rng.choice(stops), rng.choice(stops)
+
+    def name_part():
+        name = backend.stops[rng.choice(stops)]["name"].lower()
+        return name[:rng.randint(1, len(name))]
+
+    # (weight, request) — roughly a journey-planner mix
+    mix = [
+        (20, lambda: backend.search_stop(name_part())),
+        (10, lambda: backend.select_origin_destination(name_part(), name_part())),
+        (5, lambda: backend.find_nearest_stop(*tap())),
+        (25, lambda: backend.get_shortest_distance_route(*pair())),
+        (10, lambda: backend.get_fastest_route(*pair(), departure_time=datetime.datetime.now())),
+        (5, lambda: backend.get_cheapest_route(*pair())),
+        (10, lambda: backend.get_least_transfers_route(*pair())),
+        (5, lambda: backend.get_alternative_routes(*pair(), k=3)),
+        (10, lambda: backend.plan_trip(*tap(), *tap())),
+    ]
+    weights = [w for w, _ in mix]
+
+    backend.start_request_log(args.log)
+    try:
+        for _ in range(args.requests):
+            call = rng.choices(mix, weights)[0][1]
+            try:
+                call()
+            except Exception:
+                pass  # failures (no path, etc.) are part of the traffic
+            time.sleep(rng.expovariate(args.rate))
+    finally:
+        backend.stop_request_log()
+        server.shutdown()
+    print(f"Recorded {args.requests} requests to {args.log}")
+
+
+# ============================================================
+#  replay — drive a backend from a log
+# ============================================================
+def replay(args):
+    records = read_request_log(args.log)
+    if not records:
+        print("Log is empty.")
+        return
+
+    backend, server = build_backend(args.side)
+    results = []
+    lock = threading.Lock()
+
+    def run(record, due):
+        lag = time.perf_counter() - due
+        method = getattr(backend, record["m"])
+        t = time.perf_counter()
+        try:
+            method(*record["a"], **record["k"])
+            ok = True
+        except Exception:
+            ok = False
+        ms = (time.perf_counter() - t) * 1000.0
+        with lock:
+            results.append((record["m"], ms, ok, lag * 1000.0, record["ms"]))
+
+    t0 = records[0]["t"]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for record in records:
+            due = start + ((record["t"] - t0) / args.speed if args.speed > 0 else 0.0)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(run, record, due)
+    wall = time.perf_counter() - start
+    server.shutdown()
+
+    report(results, wall, args)
+
+
+def report(results, wall, args):
+    speed = f"{args.speed:g}x" if args.speed > 0 else "max"
+    print(f"\n=== Replay: {len(results)} requests, speed {speed}, concurrency {args.concurrency} ===")
+    print(f"Wall time {wall:.2f} s, throughput {len(results) / wall:.1f} req/s")
+
+    print(f"\n{'method':<30} {'n':>6} {'err':>5} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} "
+          f"{'max ms':>9} {'rec p50':>9}")
+    by_method = {}
+    for row in results:
+        by_method.setdefault(row[0], []).append(row)
+    for method in sorted(by_method) + ["ALL"]:
+        rows = results if method == "ALL" else by_method[method]
+        ms = np.array([r[1] for r in rows])
+        recorded = np.array([r[4] for r in rows])
+        errors = sum(1 for r in rows if not r[2])
+        p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+        print(f"{method:<30} {len(rows):>6} {errors:>5} {p50:>9.2f} {p90:>9.2f} {p99:>9.2f} "
+              f"{ms.max():>9.2f} {np.percentile(recorded, 50):>9.2f}")
+
+    lag = np.array([r[3] for r in results])
+    print(f"\nStart lag behind schedule: p50 {np.percentile(lag, 50):.2f} ms, "
+          f"p99 {np.percentile(lag, 99):.2f} ms (grows when the backend cannot keep up)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("record", help="generate a synthetic request log")
+    p.add_argument("log")
+    p.add_argument("--requests", type=int, default=300)
+    p.add_argument("--rate", type=float, default=50.0, help="mean requests per second")
+    p.add_argument("--side", type=int, default=0, help="synthetic network side (0 = dummy network)")
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=record)
+
+    p = sub.add_parser("replay", help="replay a request log against a fresh backend")
+    p.add_argument("log")
+    p.add_argument("--speed", type=float, default=1.0, help="time acceleration; 0 = as fast as possible")
+    p.add_argument("-c", "--concurrency", type=int, default=4)
+    p.add_argument("--side", type=int, default=0, help="synthetic network side (0 = dummy network)")
+    p.set_defaults(func=replay)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
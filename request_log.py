@@ -0,0 +1,147 @@
+import datetime
+import json
+import threading
+import time
+from typing import List, Dict, Any
+
+
+# Backend calls that are captured (user-facing search and routing entry points)
+LOGGED_METHODS = (
+    "find_nearest_stop",
+    "search_stop",
+    "select_origin_destination",
+    "get_shortest_distance_route",
+    "get_fastest_route",
+    "get_cheapest_route",
+    "get_least_transfers_route",
+    "get_alternative_routes",
+    "plan_trip",
+)
+
+
+def _encode(value):
+    """Make call arguments JSON-safe (datetimes and sets are tagged so they round-trip)."""
+    if isinstance(value, datetime.datetime):
+        return {"__dt__": value.isoformat()}
+    if isinstance(value, (set, frozenset)):
+        return {"__set__": [_encode(v) for v in value]}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if "__dt__" in value:
+            return datetime.datetime.fromisoformat(value["__dt__"])
+        if "__set__" in value:
+            return {_hashable(_decode(v)) for v in value["__set__"]}
+        return {k: _decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+def _hashable(value):
+    """Set members that were tuples come back from JSON as lists."""
+    if isinstance(value, list):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+class RequestLog:
+    """
+    Opt-in capture of backend calls to a JSONL file, one line per call:
+
+        {"t": 1.204, "m": "search_stop", "a": ["sto"], "k": {}, "ms": 0.05, "ok": true}
+
+    t  - seconds since capture started (used for replay pacing)
+    ms - latency of the call as served
+
+    Calls made from inside another logged call (e.g. search_stop inside
+    select_origin_destination) are not logged, so replay does not count
+    them twice.
+
+    The file is overwritten on start, so each log holds one capture.
+    Logging never changes what a call returns or raises: a call whose
+    record cannot be written is skipped and counted in `dropped`.
+    """
+
+    def __init__(self, backend, path):
+        self.backend = backend
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._start = None
+        self.dropped = 0
+
+    def start(self):
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._start = time.perf_counter()
+        for name in LOGGED_METHODS:
+            setattr(self.backend, name, self._wrap(name, getattr(self.backend, name)))
+
+    def stop(self):
+        for name in LOGGED_METHODS:
+            # drop the instance attribute, exposing the class method again
+            self.backend.__dict__.pop(name, None)
+        with self._lock:
+            self._file.close()
+            self._file = None
+
+    def _wrap(self, name, method):
+        def logged(*args, **kwargs):
+            depth = getattr(self._local, "depth", 0)
+            if depth:
+                return method(*args, **kwargs)
+
+            self._local.depth = 1
+            t = time.perf_counter()
+            ok = True
+            try:
+                return method(*args, **kwargs)
+            except Exception:
+                ok = False
+                raise
+            finally:
+                ms = (time.perf_counter() - t) * 1000.0
+                self._local.depth = 0
+                self._write(t, name, args, kwargs, ms, ok)
+
+        logged.__wrapped__ = method
+        return logged
+
+    def _write(self, t, name, args, kwargs, ms, ok):
+        try:
+            line = json.dumps({
+                "t": round(t - self._start, 6),
+                "m": name,
+                "a": _encode(list(args)),
+                "k": _encode(kwargs),
+                "ms": round(ms, 3),
+                "ok": ok,
+            }, separators=(",", ":"))
+            with self._lock:
+                if self._file is not None:
+                    self._file.write(line + "\n")
+        except Exception:
+            # e.g. arguments that are not JSON-serialisable, or a full disk
+            with self._lock:
+                self.dropped += 1
+
+
+def read_request_log(path) -> List[Dict[str, Any]]:
+    """Load a captured log, sorted by call start time, with arguments decoded."""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                r = json.loads(line)
+                r["a"] = _decode(r["a"])
+                r["k"] = _decode(r["k"])
+                records.append(r)
+    records.sort(key=lambda r: r["t"])
+    return records
@@ -0,0 +1,413 @@
+import heapq
+import json
+import math
+import xml.etree.ElementTree as ET
+from typing import Dict, Any, Optional
+
+import networkx as nx
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+# OSM highway types pedestrians cannot use
+NON_WALKABLE_HIGHWAYS = {"motorway", "motorway_link", "trunk", "trunk_link"}
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in KM. Never overestimates a walk on the ground,
+    so it is a valid A* lower bound.
+    """
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _bearing(lat1, lon1, lat2, lon2):
+    """Initial compass bearing in degrees (0 = north)."""
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    dl = math.radians(lon2 - lon1)
+    x = math.sin(dl) * math.cos(p2)
+    y = math.cos(p1) * math.sin(p2) - math.sin(p1) * math.cos(p2) * math.cos(dl)
+    return (math.degrees(math.atan2(x, y)) + 360) % 360
+
+
+def _compass(bearing):
+    return ["north", "northeast", "east", "southeast",
+            "south", "southwest", "west", "northwest"][int((bearing + 22.5) // 45) % 8]
+
+
+def _turn(prev_bearing, bearing):
+    delta = (bearing - prev_bearing + 540) % 360 - 180
+    if abs(delta) < 30:
+        return "Continue"
+    if abs(delta) > 150:
+        return "Make a U-turn"
+    side = "right" if delta > 0 else "left"
+    return f"Turn {side}" if abs(delta) >= 60 else f"Turn slightly {side}"
+
+
+class WalkingRouter:
+    """
+    Offline pedestrian router (FR2.4.4).
+
+    Holds a street graph loaded from a GeoJSON or OSM XML extract, a grid
+    index over its edges for snapping coordinates, and runs A* with a
+    haversine heuristic. No network calls.
+    """
+
+    # Edge index cell size in degrees (~250 m)
+    EDGE_GRID_CELL_DEG = 0.0025
+
+    # Points farther than this from every street are not snapped (KM)
+    MAX_SNAP_KM = 0.4
+
+    def __init__(self):
+        # node_id -> (lat, lon)
+        self.nodes = []
+        # node_id -> [(neighbour_id, length_km, street_name), ...]
+        self.adj = []
+        # [(u, v, length_km, street_name), ...]
+        self.edges = []
+        # {(row, col): [edge_index, ...]}
+        self._edge_grid = {}
+        self._node_ids = {}
+
+    # ============================================================
+    # ====================  LOADING  =============================
+    # ============================================================
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a .geojson / .json or .osm extract."""
+        if path.lower().endswith(".osm"):
+            return cls.from_osm_xml(path)
+        return cls.from_geojson(path)
+
+    @classmethod
+    def from_geojson(cls, path):
+        """
+        Load LineString / MultiLineString features. The street name is read
+        from properties["name"]; features tagged as motorways or foot=no
+        are skipped.
+        """
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        router = cls()
+        for feature in data.get("features", []):
+            props = feature.get("properties") or {}
+            if not cls._is_walkable(props):
+                continue
+            geom = feature.get("geometry") or {}
+            if geom.get("type") == "LineString":
+                lines = [geom["coordinates"]]
+            elif geom.get("type") == "MultiLineString":
+                lines = geom["coordinates"]
+            else:
+                continue
+            for coords in lines:
+                # GeoJSON order is [lon, lat]
+                router.add_way([(c[1], c[0]) for c in coords], props.get("name"))
+        return router
+
+    @classmethod
+    def from_osm_xml(cls, path):
+        """Load <way> elements with a highway tag from an OSM XML extract."""
+        root = ET.parse(path).getroot()
+        coords = {
+            n.get("id"): (float(n.get("lat")), float(n.get("lon")))
+            for n in root.iter("node")
+        }
+
+        router = cls()
+        for way in root.iter("way"):
+            tags = {t.get("k"): t.get("v") for t in way.iter("tag")}
+            if "highway" not in tags or not cls._is_walkable(tags):
+                continue
+            points = [coords[nd.get("ref")] for nd in way.iter("nd") if nd.get("ref") in coords]
+            router.add_way(points, tags.get("name"))
+        return router
+
+    @staticmethod
+    def _is_walkable(tags):
+        return tags.get("highway") not in NON_WALKABLE_HIGHWAYS and tags.get("foot") != "no"
+
+    def add_way(self, points, name=None):
+        """Add a polyline [(lat, lon), ...] as consecutive two-way edges."""
+        for (lat1, lon1), (lat2, lon2) in zip(points, points[1:]):
+            u = self._node_id(lat1, lon1)
+            v = self._node_id(lat2, lon2)
+            if u == v:
+                continue
+            length = haversine_km(lat1, lon1, lat2, lon2)
+            self.adj[u].append((v, length, name))
+            self.adj[v].append((u, length, name))
+            self.edges.append((u, v, length, name))
+            self._index_edge(len(self.edges) - 1)
+
+    def _node_id(self, lat, lon):
+        # Shared vertices between ways are joined on rounded coordinates
+        key = (round(lat, 7), round(lon, 7))
+        node = self._node_ids.get(key)
+        if node is None:
+            node = len(self.nodes)
+            self._node_ids[key] = node
+            self.nodes.append((lat, lon))
+            self.adj.append([])
+        return node
+
+    def _index_edge(self, idx):
+        u, v, _, _ = self.edges[idx]
+        (lat1, lon1), (lat2, lon2) = self.nodes[u], self.nodes[v]
+        r1, c1 = self._cell(min(lat1, lat2), min(lon1, lon2))
+        r2, c2 = self._cell(max(lat1, lat2), max(lon1, lon2))
+        for row in range(r1, r2 + 1):
+            for col in range(c1, c2 + 1):
+                self._edge_grid.setdefault((row, col), []).append(idx)
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.EDGE_GRID_CELL_DEG), math.floor(lon / self.EDGE_GRID_CELL_DEG))
+
+    # ============================================================
+    # ====================  SNAPPING  ============================
+    # ============================================================
+
+    def snap(self, lat, lon, max_snap_km: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Project a coordinate onto the closest street edge.
+
+        Rings of grid cells are searched outwards until the nearest candidate
+        is closer than the next unexplored ring. Once a ring would cover more
+        cells than are occupied, the remaining occupied cells are scanned
+        directly instead.
+
+        Returns:
+            {"edge": idx, "t": 0..1 along u→v, "lat": ..., "lon": ..., "offset_km": ...}
+            or None if no edge is within max_snap_km (default MAX_SNAP_KM).
+        """
+        if max_snap_km is None:
+            max_snap_km = self.MAX_SNAP_KM
+        grid = self._edge_grid
+        row0, col0 = self._cell(lat, lon)
+        # Smallest possible distance to anything outside ring r is r * cell_km
+        cell_km = self.EDGE_GRID_CELL_DEG * 111.0 * math.cos(math.radians(min(abs(lat) + 1.0, 89.0)))
+        best = None
+        seen = set()
+
+        def scan(cell):
+            nonlocal best
+            for idx in grid[cell]:
+                if idx in seen:
+                    continue
+                seen.add(idx)
+                cand = self._project(idx, lat, lon)
+                if cand["offset_km"] <= max_snap_km and (best is None or cand["offset_km"] < best["offset_km"]):
+                    best = cand
+
+        ring = 0
+        while True:
+            if (2 * ring + 1) ** 2 > len(grid):
+                for cell in list(grid):
+                    if max(abs(cell[0] - row0), abs(cell[1] - col0)) >= ring:
+                        scan(cell)
+                break
+
+            if ring == 0:
+                ring_cells = [(row0, col0)]
+            else:
+                ring_cells = [(row0 - ring, c) for c in range(col0 - ring, col0 + ring + 1)]
+                ring_cells += [(row0 + ring, c) for c in range(col0 - ring, col0 + ring + 1)]
+                ring_cells += [(r, col0 - ring) for r in range(row0 - ring + 1, row0 + ring)]
+                ring_cells += [(r, col0 + ring) for r in range(row0 - ring + 1, row0 + ring)]
+            for cell in ring_cells:
+                if cell in grid:
+                    scan(cell)
+
+            bound = ring * cell_km
+            if bound > max_snap_km:
+                break
+            if best is not None and best["offset_km"] <= bound:
+                break
+            ring += 1
+        return best
+
+    def _project(self, idx, lat, lon):
+        u, v, _, _ = self.edges[idx]
+        (lat1, lon1), (lat2, lon2) = self.nodes[u], self.nodes[v]
+
+        # Local equirectangular plane around the point
+        k = math.cos(math.radians(lat))
+        ax, ay = (lon1 - lon) * k, lat1 - lat
+        bx, by = (lon2 - lon) * k, lat2 - lat
+        dx, dy = bx - ax, by - ay
+        seg2 = dx * dx + dy * dy
+        t = 0.0 if seg2 == 0 else max(0.0, min(1.0, -(ax * dx + ay * dy) / seg2))
+
+        plat = lat1 + t * (lat2 - lat1)
+        plon = lon1 + t * (lon2 - lon1)
+        return {
+            "edge": idx,
+            "t": t,
+            "lat": plat,
+            "lon": plon,
+            "offset_km": haversine_km(lat, lon, plat, plon),
+        }
+
+    # ============================================================
+    # ====================  ROUTING  =============================
+    # ============================================================
+
+    def route(self, lat1, lon1, lat2, lon2) -> Dict[str, Any]:
+        """
+        Walking route between two coordinates.
+
+        Returns:
+            {
+                "distance_km": 0.82,
+                "polyline": [(lat, lon), ...],
+                "steps": [{"instruction": "...", "street": "...", "distance_km": ...}, ...]
+            }
+
+        Raises:
+            networkx.NetworkXNoPath if either point cannot be snapped or the
+            two snapped points are not connected.
+        """
+        src = self.snap(lat1, lon1)
+        dst = self.snap(lat2, lon2)
+        if src is None or dst is None:
+            raise nx.NetworkXNoPath("Location is too far from the walking network.")
+
+        src_links = self._endpoint_links(src)
+        dst_links = {node: cost for node, cost in self._endpoint_links(dst)}
+        tlat, tlon = dst["lat"], dst["lon"]
+
+        # Both points on the same street edge: walk along it directly
+        best_total = float("inf")
+        best_node = None
+        if src["edge"] == dst["edge"]:
+            length = self.edges[src["edge"]][2]
+            best_total = abs(src["t"] - dst["t"]) * length
+
+        # --- A* from the virtual source node ---
+        # Heap entries are (f, -g, node): on equal f the deeper node wins,
+        # which avoids expanding whole plateaus on grid-like street plans.
+        nodes = self.nodes
+        g = {}
+        parent = {}
+        heap = []
+        for node, cost in src_links:
+            if cost < g.get(node, float("inf")):
+                g[node] = cost
+                parent[node] = None
+                lat, lon = nodes[node]
+                heapq.heappush(heap, (cost + haversine_km(lat, lon, tlat, tlon), -cost, node))
+
+        closed = set()
+        while heap:
+            f, cost, node = heapq.heappop(heap)
+            cost = -cost
+            if f >= best_total:
+                break
+            if node in closed:
+                continue
+            closed.add(node)
+
+            if node in dst_links and cost + dst_links[node] < best_total:
+                best_total = cost + dst_links[node]
+                best_node = node
+
+            for nbr, length, _ in self.adj[node]:
+                new_cost = cost + length
+                if new_cost < g.get(nbr, float("inf")):
+                    g[nbr] = new_cost
+                    parent[nbr] = node
+                    lat, lon = nodes[nbr]
+                    heapq.heappush(heap, (new_cost + haversine_km(lat, lon, tlat, tlon), -new_cost, nbr))
+
+        if best_total == float("inf"):
+            raise nx.NetworkXNoPath("No walking path between the two locations.")
+
+        path = []
+        node = best_node
+        while node is not None:
+            path.append(node)
+            node = parent[node]
+        path.reverse()
+
+        polyline = [(lat1, lon1), (src["lat"], src["lon"])]
+        polyline += [nodes[n] for n in path]
+        polyline += [(dst["lat"], dst["lon"]), (lat2, lon2)]
+
+        distance = best_total + src["offset_km"] + dst["offset_km"]
+        return {
+            "distance_km": distance,
+            "polyline": polyline,
+            "steps": self._build_steps((lat1, lon1), src, dst, (lat2, lon2), path),
+        }
+
+    def _endpoint_links(self, snapped):
+        """Costs from a snapped point to both ends of its edge."""
+        u, v, length, _ = self.edges[snapped["edge"]]
+        return [(u, snapped["t"] * length), (v, (1 - snapped["t"]) * length)]
+
+    def _build_steps(self, origin, src, dst, destination, nodes):
+        """
+        Turn-by-turn steps: consecutive edges on the same street are merged
+        into one step. The walks from the origin onto the street network and
+        off it to the destination are steps of their own, so the step
+        distances add up to the route distance.
+        """
+        legs = []  # (street, off_network, distance_km, start_bearing, end_bearing)
+
+        def add_leg(street, a, b, off_network=False):
+            d = haversine_km(a[0], a[1], b[0], b[1])
+            if d < 1e-6:
+                # sub-millimetre leg (snapped exactly onto a node)
+                return
+            brg = _bearing(a[0], a[1], b[0], b[1])
+            if legs and legs[-1][:2] == (street, off_network) and not off_network:
+                s, off, dist, start, _ = legs[-1]
+                legs[-1] = (s, off, dist + d, start, brg)
+            else:
+                legs.append((street, off_network, d, brg, brg))
+
+        src_street = self.edges[src["edge"]][3]
+        dst_street = self.edges[dst["edge"]][3]
+        points = [(src["lat"], src["lon"])] + [self.nodes[n] for n in nodes] + [(dst["lat"], dst["lon"])]
+        streets = [src_street] + [self._street_between(a, b) for a, b in zip(nodes, nodes[1:])] + [dst_street]
+        add_leg(src_street, origin, points[0], off_network=True)
+        for street, a, b in zip(streets, points, points[1:]):
+            add_leg(street, a, b)
+        add_leg(dst_street, points[-1], destination, off_network=True)
+
+        steps = []
+        prev_bearing = None
+        for i, (street, off_network, dist, start, end) in enumerate(legs):
+            label = street or "unnamed path"
+            if off_network and i == 0:
+                instruction = f"Walk {_compass(start)} to {label}"
+                street = None
+            elif off_network:
+                instruction = f"Leave {label} and walk {_compass(start)}"
+                street = None
+            elif prev_bearing is None:
+                instruction = f"Head {_compass(start)} on {label}"
+            else:
+                instruction = f"{_turn(prev_bearing, start)} onto {label}"
+            steps.append({"instruction": instruction, "street": street, "distance_km": dist})
+            prev_bearing = end
+
+        steps.append({"instruction": "Arrive at destination", "street": None, "distance_km": 0.0})
+        return steps
+
+    def _street_between(self, u, v):
+        best = None
+        for nbr, length, name in self.adj[u]:
+            if nbr == v and (best is None or length < best[0]):
+                best = (length, name)
+        return best[1] if best else None